@@ -0,0 +1,491 @@
+#!/usr/bin/env python
+
+# A small daemon which owns one or more hd44780_i2c displays and accepts updates from local clients
+# over a Unix domain socket.  This lets several processes share a display without each of them
+# re-running the display initialization and fighting over the I2C bus.  All client updates are
+# serialized through a single process, and a copy of the current frame is kept so only the cells
+# which actually change are sent to the hardware.
+#
+# Run with:  python -m rpi_drivers.hd44780_daemon --display 1:0x27:4:20
+# Doctests:  python -m doctest rpi_drivers/hd44780_daemon.py
+#
+# The socket is created with mode 0660 (see --mode), so clients must run as the daemon's user or group.
+# The directory holding the socket should not be writable by untrusted users.
+#
+# Protocol (all integers are unsigned, network byte order):
+#   request header (5 bytes): op, display, row, col, length
+#   followed by 'length' bytes of character data (0-255)
+#
+#   OP_WRITE - write the data to the display starting at row, col. Data past the end of the line is dropped.
+#   OP_LINE  - write the data starting at row, col and blank the remainder of the line.
+#   OP_CLEAR - blank the entire display. row, col and length are ignored.
+#   OP_STATS - reply with the stats for this client connection (see STATS below).
+#   OP_REFRESH - clear the display and redraw it from the cached frame, for when the display no longer
+#                matches the cache. row, col and length are ignored.
+#
+# Only OP_STATS sends a reply, all other ops are fire and forget so clients can stream updates.
+# An invalid op or display number will cause the daemon to close the client connection.
+#
+# Sending SIGUSR1 to the daemon logs the stats for all connected clients.
+
+from time import time
+import argparse
+import logging
+import os
+import signal
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import threading
+
+from rpi_drivers.hd44780_i2c import hd44780_i2c
+
+DEFAULT_SOCKET_PATH = '/run/hd44780.sock'
+DEFAULT_SOCKET_MODE = 0o660
+
+OP_WRITE = 0x01
+OP_LINE  = 0x02
+OP_CLEAR = 0x03
+OP_STATS = 0x04
+OP_REFRESH = 0x05
+
+HEADER = struct.Struct('!BBBBB')
+# messages, bytes received, cells sent to display, cells skipped (unchanged), elapsed msecs
+STATS  = struct.Struct('!QQQQQ')
+
+BLANK = 0x20
+
+def _log_stats(client_id, stats):
+  """
+  (API PRIVATE) Log the throughput stats for a client
+  """
+  elapsed = max(time() - stats['start'], 0.001)
+  logging.info("client %d: %d msgs, %d bytes in %.1fs (%.1f bytes/sec), %d cells sent, %d cells skipped",
+               client_id, stats['messages'], stats['bytes'], elapsed, stats['bytes'] / elapsed,
+               stats['sent'], stats['skipped'])
+
+def pack_message(op, display = 0, row = 0, col = 0, data = b''):
+  """
+  Build a request message for the daemon.  Strings are sent as 'ord(c)' for each character, the
+  same as hd44780_i2c.printstr().  Raises ValueError for characters which don't fit in a byte,
+  or for more than 255 bytes of data.
+
+  >>> pack_message(OP_WRITE, 0, 1, 2, 'Hi')
+  b'\\x01\\x00\\x01\\x02\\x02Hi'
+  >>> pack_message(OP_STATS)
+  b'\\x04\\x00\\x00\\x00\\x00'
+  >>> pack_message(OP_WRITE, 0, 0, 0, '\\u2603')
+  Traceback (most recent call last):
+  ...
+  ValueError: character U+2603 can not be sent to the display
+  >>> pack_message(OP_WRITE, 0, 0, 0, 'x' * 256)
+  Traceback (most recent call last):
+  ...
+  ValueError: data length 256 exceeds 255 bytes
+  """
+  if isinstance(data, str):
+    for c in data:
+      if ord(c) > 0xFF:
+        raise ValueError("character U+%04X can not be sent to the display" % ord(c))
+    data = bytes(ord(c) for c in data)
+
+  if len(data) > 255:
+    raise ValueError("data length %d exceeds 255 bytes" % len(data))
+
+  return HEADER.pack(op, display, row, col, len(data)) + data
+
+class frame_cache():
+  """
+  Keep a copy of what is currently shown on a display, and only send the cells that differ.
+  """
+  def __init__(self, lcd):
+    self.lcd = lcd
+    self.lock = threading.Lock()
+    # A hidden cursor lets hd44780_i2c merge the cursor moves between runs of changed cells
+    lcd.cursor_off()
+    lcd.blink_off()
+    # _init_display() finishes with a clear(), so the display starts out blank
+    self.frame = [ bytearray([BLANK] * lcd.cols) for r in range(lcd.rows) ]
+
+  def update(self, row, col, data):
+    """
+    Update the frame starting at row, col, writing only the runs of changed cells to the display.
+    Returns a tuple of (cells sent, cells skipped).
+
+    >>> f = frame_cache(hd44780_i2c(1, 1, 4, 20, test = 1))
+    UNDER TEST
+    >>> f.update(0, 0, b'Hello')
+    (5, 0)
+    >>> f.update(0, 0, b'Help!')
+    (2, 3)
+    >>> f.update(0, 18, b'abcd')
+    (2, 0)
+    >>> f.update(9, 0, b'x')
+    (0, 0)
+    """
+    if row < 0 or row >= self.lcd.rows or col < 0 or col >= self.lcd.cols:
+      return (0, 0)
+
+    data = data[:self.lcd.cols - col]
+    sent = 0
+
+    with self.lock:
+      line = self.frame[row]
+      cursor = None
+      for i, val in enumerate(data):
+        pos = col + i
+        if line[pos] == val:
+          continue
+
+        # The display auto-increments the address after each write, so only
+        # move the cursor when starting a new run of changed cells
+        if cursor != pos:
+          self.lcd.set_cursor(row, pos)
+
+        self.lcd.write(val)
+        line[pos] = val
+        cursor = pos + 1
+        sent += 1
+
+    return (sent, len(data) - sent)
+
+  def update_line(self, row, col, data):
+    """
+    Same as update(), but blank the remainder of the line after the data.
+
+    >>> f = frame_cache(hd44780_i2c(1, 1, 4, 20, test = 1))
+    UNDER TEST
+    >>> f.update(1, 0, b'Goodbye')
+    (7, 0)
+    >>> f.update_line(1, 0, b'Good')
+    (3, 17)
+    """
+    data = bytes(data[:max(self.lcd.cols - col, 0)])
+    return self.update(row, col, data.ljust(self.lcd.cols - col, bytes([BLANK])))
+
+  def clear(self):
+    """
+    Blank the entire display, only sending the cells which are not already blank.
+    """
+    sent = skipped = 0
+    for r in range(self.lcd.rows):
+      s, k = self.update_line(r, 0, b'')
+      sent += s
+      skipped += k
+
+    return (sent, skipped)
+
+  def refresh(self):
+    """
+    Clear the display and rewrite every non-blank cell from the cached frame, regardless of what the cache
+    thinks is on the display.  Returns a tuple of (cells sent, cells skipped) like update().
+
+    >>> f = frame_cache(hd44780_i2c(1, 1, 2, 16, test = 1))
+    UNDER TEST
+    >>> f.update(0, 0, b'Hi there')
+    (7, 1)
+    >>> f.refresh()
+    (7, 25)
+    """
+    sent = 0
+
+    with self.lock:
+      self.lcd.clear()
+      for row, line in enumerate(self.frame):
+        cursor = None
+        for pos, val in enumerate(line):
+          if val == BLANK:
+            continue
+
+          if cursor != pos:
+            self.lcd.set_cursor(row, pos)
+
+          self.lcd.write(val)
+          cursor = pos + 1
+          sent += 1
+
+    return (sent, self.lcd.rows * self.lcd.cols - sent)
+
+class _client_handler(socketserver.BaseRequestHandler):
+  """
+  (API PRIVATE) Handle the requests from a single client connection
+  """
+  def setup(self):
+    self.stats = { 'messages': 0, 'bytes': 0, 'sent': 0, 'skipped': 0, 'start': time() }
+    self.server.register_client(self)
+
+  def handle(self):
+    while True:
+      hdr = self._recv(HEADER.size)
+      if hdr is None:
+        break
+
+      op, display, row, col, length = HEADER.unpack(hdr)
+      data = self._recv(length) if length > 0 else b''
+      if data is None:
+        break
+
+      self.stats['messages'] += 1
+      self.stats['bytes'] += HEADER.size + length
+
+      if op == OP_STATS:
+        self.request.sendall(self.pack_stats())
+        continue
+
+      if display >= len(self.server.frames):
+        logging.warning("client %d: invalid display %d", id(self), display)
+        break
+
+      frame = self.server.frames[display]
+      if op == OP_WRITE:
+        sent, skipped = frame.update(row, col, data)
+      elif op == OP_LINE:
+        sent, skipped = frame.update_line(row, col, data)
+      elif op == OP_CLEAR:
+        sent, skipped = frame.clear()
+      elif op == OP_REFRESH:
+        sent, skipped = frame.refresh()
+      else:
+        logging.warning("client %d: invalid op %d", id(self), op)
+        break
+
+      self.stats['sent'] += sent
+      self.stats['skipped'] += skipped
+
+  def finish(self):
+    self.server.unregister_client(self)
+    _log_stats(id(self), self.stats)
+
+  def pack_stats(self):
+    elapsed = int((time() - self.stats['start']) * 1000)
+    return STATS.pack(self.stats['messages'], self.stats['bytes'], self.stats['sent'],
+                      self.stats['skipped'], elapsed)
+
+  def _recv(self, size):
+    """
+    (API PRIVATE) Read exactly size bytes from the client, returns None if the client went away
+    """
+    buf = b''
+    while len(buf) < size:
+      chunk = self.request.recv(size - len(buf))
+      if not chunk:
+        return None
+      buf += chunk
+
+    return buf
+
+class hd44780_daemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+  daemon_threads = True
+
+  def __init__(self, socket_path, displays = [], mode = DEFAULT_SOCKET_MODE):
+    """
+    Create the daemon listening on socket_path, with the socket permissions set to mode.  The optional
+    displays parameter is a list of already initialized hd44780_i2c objects, more can be added with
+    add_display().  Clients refer to displays by their (zero-based) position in the list.  Raises IOError
+    if socket_path is in use by another daemon, or is something other than a socket.
+
+    >>> import tempfile, threading
+    >>> path = os.path.join(tempfile.mkdtemp(), 'lcd.sock')
+    >>> server = hd44780_daemon(path, [ hd44780_i2c(1, 1, 2, 16, test = 1) ])
+    UNDER TEST
+    >>> t = threading.Thread(target = server.serve_forever)
+    >>> t.start()
+    >>> hd44780_daemon(path, []) # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    OSError: ... is in use by another process
+    >>> client = hd44780_client(path)
+    >>> client.write_line(0, 'Hello')
+    >>> client.write(0, 0, 'Jello')
+    >>> s = client.stats()
+    >>> s['messages'], s['bytes'], s['sent'], s['skipped']
+    (3, 25, 6, 15)
+    >>> client.refresh()
+    >>> s = client.stats()
+    >>> s['messages'], s['bytes'], s['sent'], s['skipped']
+    (5, 35, 11, 42)
+    >>> oct(os.stat(path).st_mode & 0o777)
+    '0o660'
+    >>> client.close()
+    >>> server.shutdown()
+    >>> server.server_close()
+    >>> t.join()
+    >>> os.path.exists(path)
+    False
+    """
+    self._remove_stale_socket(socket_path)
+
+    self.socket_path = socket_path
+    self.socket_mode = mode
+    self.frames = [ frame_cache(d) for d in displays ]
+    self.clients = {}
+    self.clients_lock = threading.Lock()
+
+    socketserver.UnixStreamServer.__init__(self, socket_path, _client_handler)
+
+  def server_bind(self):
+    # Create the socket with no group/other access, then open it up to the requested mode,
+    # so there's no window where it has the (possibly too permissive) process umask
+    umask = os.umask(0o177)
+    try:
+      socketserver.UnixStreamServer.server_bind(self)
+    finally:
+      os.umask(umask)
+
+    os.chmod(self.socket_path, self.socket_mode)
+
+  def add_display(self, lcd):
+    """
+    Add an initialized hd44780_i2c object to the displays served by the daemon.  Returns the display number
+    clients should use for it.
+    """
+    self.frames.append(frame_cache(lcd))
+    return len(self.frames) - 1
+
+  def _remove_stale_socket(self, socket_path):
+    """
+    (API PRIVATE) Remove a socket left behind by a previous run.  Anything which isn't a socket, or a socket
+    another process is still accepting connections on, is left alone and an IOError is raised.
+    """
+    try:
+      mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+      return
+
+    if not stat.S_ISSOCK(mode):
+      raise IOError("%s exists and is not a socket" % socket_path)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+      sock.connect(socket_path)
+    except ConnectionRefusedError:
+      os.unlink(socket_path)
+      return
+    finally:
+      sock.close()
+
+    raise IOError("%s is in use by another process" % socket_path)
+
+  def register_client(self, handler):
+    with self.clients_lock:
+      self.clients[id(handler)] = handler.stats
+
+  def unregister_client(self, handler):
+    with self.clients_lock:
+      self.clients.pop(id(handler), None)
+
+  def client_stats(self):
+    """
+    Return a copy of the stats for all connected clients, keyed by client id
+    """
+    with self.clients_lock:
+      return dict((k, dict(v)) for k, v in self.clients.items())
+
+  def log_client_stats(self, *args):
+    """
+    Log the stats for all connected clients.  Accepts (and ignores) the arguments of a signal handler.
+    """
+    clients = self.client_stats()
+    logging.info("%d clients connected", len(clients))
+
+    for k, v in clients.items():
+      _log_stats(k, v)
+
+  def server_close(self):
+    socketserver.UnixStreamServer.server_close(self)
+    if os.path.exists(self.socket_path):
+      os.unlink(self.socket_path)
+
+class hd44780_client():
+  def __init__(self, socket_path = DEFAULT_SOCKET_PATH, display = 0):
+    """
+    Connect to a running hd44780_daemon.  The optional display parameter selects which of the
+    daemon's displays this client will update.
+    """
+    self.display = display
+    self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    self.sock.connect(socket_path)
+
+  def write(self, row, col, val):
+    """
+    Write the string (or bytes) to the display starting at the given row and col
+    """
+    self.sock.sendall(pack_message(OP_WRITE, self.display, row, col, val))
+
+  def write_line(self, row, val, col = 0):
+    """
+    Write the string (or bytes) to the display starting at the given row and col, and blank the rest of the line
+    """
+    self.sock.sendall(pack_message(OP_LINE, self.display, row, col, val))
+
+  def clear(self):
+    """
+    Blank the display
+    """
+    self.sock.sendall(pack_message(OP_CLEAR, self.display))
+
+  def refresh(self):
+    """
+    Have the daemon clear the display and redraw it from its cached frame
+    """
+    self.sock.sendall(pack_message(OP_REFRESH, self.display))
+
+  def stats(self):
+    """
+    Return the daemon's stats for this client connection as a dict
+    """
+    self.sock.sendall(pack_message(OP_STATS, self.display))
+
+    buf = b''
+    while len(buf) < STATS.size:
+      chunk = self.sock.recv(STATS.size - len(buf))
+      if not chunk:
+        raise IOError("connection closed by daemon")
+      buf += chunk
+
+    messages, nbytes, sent, skipped, elapsed = STATS.unpack(buf)
+    return { 'messages': messages, 'bytes': nbytes, 'sent': sent, 'skipped': skipped, 'elapsed_ms': elapsed }
+
+  def close(self):
+    self.sock.close()
+
+def main():
+  parser = argparse.ArgumentParser(description = 'Share hd44780_i2c displays with local clients over a Unix socket')
+  parser.add_argument('--socket', default = DEFAULT_SOCKET_PATH, help = 'path of the Unix socket to listen on')
+  parser.add_argument('--display', action = 'append', required = True, metavar = 'BUS:ADDR:ROWS:COLS',
+                      help = 'display to manage, may be repeated (e.g. 1:0x27:4:20)')
+  parser.add_argument('--mode', default = DEFAULT_SOCKET_MODE, type = lambda x: int(x, 8),
+                      help = 'permissions of the socket, in octal (default: %(default)o)')
+  parser.add_argument('--test', action = 'store_true', help = 'run the displays in test mode (no I2C operations)')
+  args = parser.parse_args()
+
+  logging.basicConfig(level = logging.INFO)
+
+  # Claim the socket before touching any display, initializing a display clears it, which
+  # would wipe out a display owned by a daemon that's already running
+  try:
+    server = hd44780_daemon(args.socket, mode = args.mode)
+  except IOError as e:
+    logging.error(e)
+    sys.exit(1)
+
+  try:
+    for d in args.display:
+      bus, addr, rows, cols = [ int(x, 0) for x in d.split(':') ]
+      server.add_display(hd44780_i2c(bus, addr, rows, cols, test = args.test))
+  except Exception:
+    server.server_close()
+    raise
+
+  signal.signal(signal.SIGUSR1, server.log_client_stats)
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    server.server_close()
+
+if __name__ == "__main__":
+  main()
@@ -109,6 +109,9 @@ class hd44780_i2c():
     self.entry_mode_set = LCD_CMD_ENTRYMODESET | LCD_ENTRYLEFT | LCD_ENTRYSHIFTDECR
     self.display_control_set = LCD_CMD_DISPLAYCONTROL | LCD_DISPLAYON | LCD_CURSORON | LCD_BLINKOFF
 
+    # Forget anything we thought we knew about the display state, so nothing sent below is skipped
+    self._reset_state()
+
     # Wait at least 40ms after Vcc hits 2.7V
     sleep(0.1)
 
@@ -138,7 +141,8 @@ class hd44780_i2c():
     Initialize an instance of this class. The i2c_bus, i2c_addr, rows, and cols prameters are required and are
     hopefully self-explanatory. No special RPi setup is required other then ensuring I2C is enabled in the kernel
     (no GPIOs need to be configured).  An optional boolean kwarg named 'test' can be provided to enable test mode
-    of this class, basically no I2C operations are performed.
+    of this class, basically no I2C operations are performed.  An optional boolean kwarg named 'elide' (default True)
+    controls skipping commands which would not change the state of the display, see get_command_stats().
     """
     assert(i2c_bus >= 0)
     assert(i2c_addr > 0)
@@ -152,6 +156,9 @@ class hd44780_i2c():
     self.test = kwargs.get('test', False)
     self.set_delay()
     self.backlight = LCD_NOBACKLIGHT
+    self.elide = kwargs.get('elide', True)
+    self.cmds_sent  = 0
+    self.cmds_saved = 0
 
     if not self.test:
       # initialize I2C library and display, there is no special
@@ -183,6 +190,144 @@ class hd44780_i2c():
     self.cmd_delay  = kwargs.get('cmd', DEFAULT_CMD_DELAY) / 1000000.0
     self.char_delay = kwargs.get('char', DEFAULT_CHAR_DELAY) / 1000000.0
 
+  def _reset_state(self):
+    """
+    (API PRIVATE) Clear the tracked display state. A value of None means the state is unknown, and the next
+    command affecting it will always be sent.
+    """
+    self._display_control = None
+    self._entry_mode = None
+    self._backlight_sent = None
+    self._ddram_addr = None
+    self._pending_addr = None
+    # True if the display may be shifted, which only clear() or home() will undo
+    self._display_shifted = True
+
+  def _cursor_visible(self):
+    """
+    (API PRIVATE) Returns True if a cursor move could be seen on the display (or we don't know if it could)
+    """
+    ctl = self._display_control
+    return ctl is None or (ctl & LCD_DISPLAYON and ctl & (LCD_CURSORON | LCD_BLINKON)) != 0
+
+  def _send_command(self, val):
+    """
+    (API PRIVATE) Unconditionally send the command byte to the display and update the tracked state
+    """
+    if not self.test:
+      self._write_byte(val, LCD_REG_CMD)
+
+    sleep(self.cmd_delay) # Pause to ensure command is executed
+    self.cmds_sent += 1
+
+    # Commands are identified by their highest set bit
+    if val & LCD_CMD_SETDDRAMADDR:
+      self._ddram_addr = val & 0x7F
+    elif val & LCD_CMD_SETCGRAMADDR:
+      # Data writes now go to CGRAM, a Set DDRAM Address command is needed before writing characters
+      self._ddram_addr = None
+    elif val & LCD_CMD_FUNCTIONSET:
+      pass
+    elif val & LCD_CMD_CURSORSHIFT:
+      self._ddram_addr = None
+      if val & LCD_DISPLAYMOVE:
+        self._display_shifted = True
+    elif val & LCD_CMD_DISPLAYCONTROL:
+      self._display_control = val
+    elif val & LCD_CMD_ENTRYMODESET:
+      self._entry_mode = val
+    elif val & LCD_CMD_CURSORHOME:
+      self._ddram_addr = 0
+      self._display_shifted = False
+    elif val & LCD_CMD_CLEARDISPLAY:
+      # Clear also forces the entry mode to increment
+      self._ddram_addr = 0
+      self._display_shifted = False
+      if self._entry_mode is not None:
+        self._entry_mode |= LCD_ENTRYLEFT
+
+  def _move_cursor(self, addr):
+    """
+    (API PRIVATE) Handle a Set DDRAM Address command.  Moves to the address the cursor is already at are
+    dropped, and if the cursor can't be seen the move is held back until something needs it, so a run of
+    moves only sends the last one.
+    """
+    if self._pending_addr is not None:
+      # The held back move was never sent
+      self._pending_addr = None
+      self.cmds_saved += 1
+
+    if addr == self._ddram_addr:
+      self.cmds_saved += 1
+    elif self._cursor_visible():
+      self._send_command(LCD_CMD_SETDDRAMADDR | addr)
+    else:
+      self._pending_addr = addr
+
+  def _advance_addr(self):
+    """
+    (API PRIVATE) Track the address change the display makes after writing a character.  We give up
+    tracking (set to unknown) when reaching the end of a line's DDRAM, rather than model the wrapping.
+    """
+    if self._ddram_addr is None or self._entry_mode is None:
+      self._ddram_addr = None
+      self._display_shifted = True
+      return
+
+    if self._entry_mode & LCD_ENTRYSHIFTINCR:
+      self._display_shifted = True
+
+    if self._entry_mode & LCD_ENTRYLEFT:
+      addr = self._ddram_addr + 1
+    else:
+      addr = self._ddram_addr - 1
+
+    if self.rows > 1:
+      valid = 0x00 <= addr <= 0x27 or 0x40 <= addr <= 0x67
+    else:
+      valid = 0x00 <= addr <= 0x4F
+
+    self._ddram_addr = addr if valid else None
+
+  def flush(self):
+    """
+    Send any cursor move which has been held back.  Moves are only held back while the cursor
+    is not visible, and are sent automatically before the next character or command.
+    """
+    if self._pending_addr is not None:
+      addr = self._pending_addr
+      self._pending_addr = None
+      self._send_command(LCD_CMD_SETDDRAMADDR | addr)
+
+  def get_command_stats(self):
+    """
+    Return a dict with the count of commands sent to the display, and the count of commands
+    which were skipped because they would not have changed the display state.
+
+    >>> d = hd44780_i2c(1, 1, 2, 16, test = 1)
+    UNDER TEST
+    >>> d.cursor_off()
+    '00001100'
+    >>> d.cursor_off()
+    '00001100'
+    >>> d.set_cursor(1, 2)
+    66
+    >>> d.set_cursor(1, 3)
+    67
+    >>> d.write(65)
+    >>> d.set_backlight(1)
+    8
+    >>> d.set_backlight(1)
+    8
+    >>> d.set_cursor(0, 0)
+    0
+    >>> d.set_cursor(0, 0)
+    0
+    >>> d.get_command_stats()
+    {'sent': 4, 'saved': 4}
+    """
+    return { 'sent': self.cmds_sent, 'saved': self.cmds_saved }
+
   def _write_byte(self, val, mode):
     """
     (API PRIVATE) Write the value of the byte to the display via the I2C bus as 2 4-bit nibbles
@@ -250,24 +395,48 @@ class hd44780_i2c():
     Write a raw byte to the display.  This is what print() delegates to, and would be useful
     for printing non-printing characters or other glyphs.
     """
+    self.flush()
+
     if not self.test:
       self._write_byte(val, LCD_REG_DATA)
 
     sleep(self.char_delay)
+    self._advance_addr()
 
   def command(self, val):
     """
     Send a command byte to the display, for display-specific commands that don't
     have methods available in this library.  Returns the bit-string of the command
-    sent in order to make the operation testable.
+    sent in order to make the operation testable.  Unless elide was disabled in the constructor,
+    commands which would not change the display state are skipped (see get_command_stats()).
+    Consecutive cursor moves are only merged while the cursor and blink are off, which is not
+    the case after initialization, so call cursor_off() to get the benefit.
 
     >>> c.command(0xD5)
     '11010101'
     """
-    if not self.test:
-      self._write_byte(val, LCD_REG_CMD)
+    if not self.elide:
+      self._send_command(val)
+    elif val & LCD_CMD_SETDDRAMADDR:
+      self._move_cursor(val & 0x7F)
+    else:
+      # The low bit of the cursor home command is ignored by the display
+      is_home = val & 0xFE == LCD_CMD_CURSORHOME
+
+      if (val == LCD_CMD_CLEARDISPLAY or is_home) and self._pending_addr is not None:
+        # Both reset the address, so a held back move is pointless
+        self._pending_addr = None
+        self.cmds_saved += 1
+      else:
+        self.flush()
+
+      if ((val & 0xF8 == LCD_CMD_DISPLAYCONTROL and val == self._display_control) or
+          (val & 0xFC == LCD_CMD_ENTRYMODESET and val == self._entry_mode) or
+          (is_home and self._ddram_addr == 0 and not self._display_shifted)):
+        self.cmds_saved += 1
+      else:
+        self._send_command(val)
 
-    sleep(self.cmd_delay) # Pause to ensure command is executed
     return bin(val)[2:].zfill(8)
 
   def clear(self):
@@ -349,10 +518,28 @@ class hd44780_i2c():
 
     >>> c.get_cursor_addr()
     214
+
+    Reading the cursor address must leave the backlight on:
+
+    >>> class fake_bus():
+    ...   def __init__(self): self.log = []
+    ...   def write_byte(self, addr, val): self.log.append(val)
+    ...   def read_byte(self, addr): return 0
+    >>> d = hd44780_i2c(1, 1, 2, 16, test = 1)
+    UNDER TEST
+    >>> d.test = False
+    >>> d.bus = fake_bus()
+    >>> d.set_backlight(1)
+    8
+    >>> d.get_cursor_addr()
+    0
+    >>> d.bus.log[-1]
+    8
     """
     # Docs indicate that we need to do the read when RS is low, and R/W and E are high
     # this means it won't work via command() or any of the methods it calls.
     nibs = []
+    self.flush()
 
     if not self.test:
       # Set data pins for input, and set RS low, and R/W high
@@ -365,7 +552,8 @@ class hd44780_i2c():
         nibs.append(self.bus.read_byte(self.i2c_addr))
         self.bus.write_byte(self.i2c_addr, 0xF0 | 0x02 & ~0x04)
 
-      self.bus.write_byte(self.i2c_addr, 0x00)
+      # Restore the backlight bit, which the writes above have turned off
+      self.bus.write_byte(self.i2c_addr, 0x00 | self.backlight)
     else:
       # Mock value = 0xD6 (busy flag on + address = 0x56 [row 3, col 2])
       nibs.append(0xDF)
@@ -458,9 +646,16 @@ class hd44780_i2c():
     else:
       self.backlight = LCD_NOBACKLIGHT
 
+    if self.elide and self.backlight == self._backlight_sent:
+      self.cmds_saved += 1
+      return self.backlight
+
     if not self.test:
       self.bus.write_byte(self.i2c_addr, self.backlight)
 
+    self._backlight_sent = self.backlight
+    self.cmds_sent += 1
+
     return self.backlight
 
   def set_contrast(self, val):